@@ -1,27 +1,142 @@
 # backend/analyzer.py
 import ast
-from typing import Dict, List, Tuple, Optional
+import codecs
+import re
 import tokenize
-from io import StringIO
+from dataclasses import dataclass
+from io import BytesIO
+from itertools import accumulate
+from typing import Any, Callable, Dict, List, Tuple, Optional, Sequence, Union
+
+# Bump whenever the report format changes, so cached reports are invalidated
+ANALYZER_VERSION = "5"
+
+# ast.unparse is only available on Python 3.9+; resolved once at import time
+_UNPARSE: Optional[Callable[[ast.AST], str]] = getattr(ast, "unparse", None)
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+DocstringNode = Union[ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef]
+
+# Nodes that can hold nested statements; expressions never contain class or
+# function definitions, so the walk does not descend into them
+_BLOCK_NODES: Tuple[type, ...] = (ast.stmt, ast.excepthandler) + ((ast.match_case,) if hasattr(ast, "match_case") else ())
+
+# Baseline docstring fragments; each argument line carries its leading newline
+_ARG_TPL = "\n    {name} ({type}): Description of {name}"
+_VARARG_TPL = "\n    *{name} ({type}): Variable positional arguments"
+_KWARG_TPL = "\n    **{name} ({type}): Variable keyword arguments"
+_RETURNS_SECTION = "\n\nReturns:\n    Any: Description of return value"
+
+# Comments and string literals matched in a single left-to-right scan, so a '#'
+# inside a string or quotes inside a comment are not miscounted.
+# Group 1: comment, group 2: triple-quoted string, group 3: other strings.
+_COMMENT_OR_STRING_PATTERN = r"""
+      (\#[^\r\n]*)
+    | ( \"\"\"(?:\\.|[^\\])*?\"\"\" | '''(?:\\.|[^\\])*?''' )
+    | ( "(?:\\.|[^"\\\r\n])*" | '(?:\\.|[^'\\\r\n])*' )
+"""
+_COMMENT_OR_STRING_RE = re.compile(_COMMENT_OR_STRING_PATTERN, re.S | re.X)
+# Same scan over raw UTF-8 bytes, so uploads never need decoding
+_COMMENT_OR_STRING_RE_BYTES = re.compile(_COMMENT_OR_STRING_PATTERN.encode(), re.S | re.X)
+
+@dataclass(slots=True)
+class ArgInfo:
+    """One function parameter; slotted so the many per-argument records stay small."""
+    name: str
+    type: str = "Any"
+    default: bool = False
+    vararg: bool = False
+    kwargs: bool = False
 
 class ASTAnalyzer(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, source_code: Union[str, bytes, None] = None, include_baseline: bool = False):
+        # Baseline docstrings are only generated when a caller will display them
+        self.include_baseline = include_baseline
+        
+        # Annotation strings keyed by their source text, so repeated annotations
+        # ("str", "Optional[int]", ...) are converted only once per file
+        if isinstance(source_code, str):
+            source_code = source_code.encode("utf-8")
+        self._source_bytes: Optional[bytes] = source_code
+        self._line_offsets: Optional[List[int]] = None
+        self._annotation_cache: Dict[bytes, str] = {}
+        self._to_str: Callable[[ast.expr], str] = _UNPARSE or self._annotation_to_string
+        
         self.classes: List[str] = []
         self.functions: List[str] = []
         self.methods: List[str] = []
         
         # New: Detailed function/method analysis
-        self.function_details: List[Dict] = []
-        self.method_details: List[Dict] = []
+        self.function_details: List[Dict[str, Any]] = []
+        self.method_details: List[Dict[str, Any]] = []
         
         # Docstring statistics
-        self.functions_with_docstrings = 0
-        self.functions_without_docstrings = 0
-        self.methods_with_docstrings = 0
-        self.methods_without_docstrings = 0
+        self.functions_with_docstrings: int = 0
+        self.functions_without_docstrings: int = 0
+        self.methods_with_docstrings: int = 0
+        self.methods_without_docstrings: int = 0
+        
+        # Lines spanned by module, class and function docstrings
+        self.docstring_lines: int = 0
+
+        # Name of the class whose body holds the node being visited (None at
+        # module level), so methods are recorded under their class wherever
+        # they sit in its body
+        self._class_name: Optional[str] = None
+        
+        # Node type -> visitor, built once so the walk needs a single dict
+        # lookup per node instead of assembling "visit_" + class name
+        self._dispatch: Dict[type, Callable[[Any], Sequence[ast.AST]]] = {
+            ast.Module: self.visit_Module,
+            ast.ClassDef: self.visit_ClassDef,
+            ast.FunctionDef: self.visit_FunctionDef,
+            ast.AsyncFunctionDef: self.visit_AsyncFunctionDef,
+        }
+
+    def visit(self, node: ast.AST) -> None:
+        """Visit a tree using the iterative walker instead of recursive generic_visit."""
+        self._iter_visit(node)
+
+    def _iter_visit(self, tree: ast.AST) -> None:
+        """Depth-first walk over the tree with an explicit stack of (node, class_name) pairs.
 
-    def _extract_function_info(self, node: ast.FunctionDef, class_name: str = None) -> Dict:
-        """Extract detailed information about a function/method including parameters and docstrings."""
+        Node types found in the dispatch table are handed to their visitor,
+        which returns the child nodes to descend into. Any other node only has
+        its statement children pushed (the bodies of if/try/with/... blocks),
+        and function bodies are never entered, so just the declaration
+        skeleton of the module is visited.
+        """
+        dispatch_get = self._dispatch.get
+        iter_child_nodes = ast.iter_child_nodes
+        block_nodes = _BLOCK_NODES
+        stack: List[Tuple[ast.AST, Optional[str]]] = [(tree, None)]
+        push = stack.append
+        pop = stack.pop
+
+        while stack:
+            node, class_name = pop()
+            visitor = dispatch_get(node.__class__)
+            children: Sequence[ast.AST]
+            if visitor is None:
+                # Block statements keep the enclosing class, so a def under
+                # an if/try/with/match in a class body is still a method
+                children = [child for child in iter_child_nodes(node) if isinstance(child, block_nodes)]
+            else:
+                # Visitors read and may update the enclosing class for the children
+                self._class_name = class_name
+                children = visitor(node)
+                class_name = self._class_name
+
+            # Push in reverse so children are popped in source order
+            for child in reversed(children):
+                push((child, class_name))
+
+    def _extract_function_info(self, node: FunctionNode, details: List[Dict[str, Any]],
+                               class_name: Optional[str] = None) -> bool:
+        """
+        Extract detailed information about a function/method including parameters and docstrings,
+        append it to details and return whether the function has a docstring.
+        """
         # Check if function has a docstring
         has_docstring = False
         docstring = ast.get_docstring(node)
@@ -31,212 +146,272 @@ class ASTAnalyzer(ast.NodeVisitor):
         
         # Check for single-line comment "docstrings" (immediately after function definition)
         # This checks for comments starting with # on the same line or next line after function definition
-        comment_lines = []
+        comment_lines: List[str] = []
         
         # Extract arguments information
-        args_info = []
+        to_str = self._annotation_str
+        args_info: List[ArgInfo] = []
         
-        # Extract positional arguments
-        for arg in node.args.args:
-            arg_name = arg.arg
+        # Extract positional arguments (positional-only first); defaults belong
+        # to the last len(defaults) of them
+        positional_args = node.args.posonlyargs + node.args.args
+        first_default = len(positional_args) - len(node.args.defaults)
+        for i, arg in enumerate(positional_args):
             arg_type = None
             if arg.annotation:
                 try:
-                    arg_type = ast.unparse(arg.annotation) if hasattr(ast, 'unparse') else self._annotation_to_string(arg.annotation)
-                except:
+                    arg_type = to_str(arg.annotation)
+                except (ValueError, AttributeError):
                     arg_type = "Any"
-            args_info.append({
-                'name': arg_name,
-                'type': arg_type or 'Any',
-                'default': False
-            })
+            args_info.append(ArgInfo(arg.arg, arg_type or 'Any', default=i >= first_default))
         
         # Extract keyword-only arguments
         for arg in node.args.kwonlyargs:
-            arg_name = arg.arg
             arg_type = None
             if arg.annotation:
                 try:
-                    arg_type = ast.unparse(arg.annotation) if hasattr(ast, 'unparse') else self._annotation_to_string(arg.annotation)
-                except:
+                    arg_type = to_str(arg.annotation)
+                except (ValueError, AttributeError):
                     arg_type = "Any"
-            args_info.append({
-                'name': arg_name,
-                'type': arg_type or 'Any',
-                'default': True  # Keyword-only args typically have defaults
-            })
+            # Keyword-only args typically have defaults
+            args_info.append(ArgInfo(arg.arg, arg_type or 'Any', default=True))
         
         # Extract varargs (*args)
         if node.args.vararg:
-            args_info.append({
-                'name': node.args.vararg.arg,
-                'type': 'Any',
-                'default': False,
-                'vararg': True
-            })
+            args_info.append(ArgInfo(node.args.vararg.arg, vararg=True))
         
         # Extract kwargs (**kwargs)
         if node.args.kwarg:
-            args_info.append({
-                'name': node.args.kwarg.arg,
-                'type': 'Any',
-                'default': False,
-                'kwargs': True
-            })
-        
-        # Extract defaults for positional arguments
-        if node.args.defaults:
-            for i, default in enumerate(node.args.defaults, start=len(node.args.args) - len(node.args.defaults)):
-                if i < len(args_info):
-                    args_info[i]['default'] = True
+            args_info.append(ArgInfo(node.args.kwarg.arg, kwargs=True))
         
         # Generate baseline docstring
-        baseline_docstring = self._generate_baseline_docstring(node.name, args_info, class_name)
+        baseline_docstring: Optional[str] = None
+        if self.include_baseline:
+            baseline_docstring = self._generate_baseline_docstring(node.name, args_info, class_name)
         
-        return {
+        details.append({
             'name': node.name,
             'class_name': class_name,
             'has_docstring': has_docstring,
             'docstring': docstring,
             'args': args_info,
-            'return_type': ast.unparse(node.returns) if node.returns and hasattr(ast, 'unparse') else None,
+            'return_type': to_str(node.returns) if node.returns else None,
             'baseline_docstring': baseline_docstring
-        }
+        })
+        return has_docstring
 
-    def _annotation_to_string(self, annotation) -> str:
-        """Convert annotation node to string (fallback for Python < 3.9)."""
-        if isinstance(annotation, ast.Name):
-            return annotation.id
-        elif isinstance(annotation, ast.Subscript):
-            value = self._annotation_to_string(annotation.value)
-            slice_str = self._annotation_to_string(annotation.slice)
-            return f"{value}[{slice_str}]"
-        elif isinstance(annotation, ast.Attribute):
-            return f"{self._annotation_to_string(annotation.value)}.{annotation.attr}"
-        elif isinstance(annotation, ast.Constant):
-            return str(annotation.value)
-        else:
-            return "Any"
+    def _source_segment(self, node: ast.expr) -> Optional[bytes]:
+        """Return the UTF-8 source text of a node, or None if the source is unknown."""
+        end_lineno = node.end_lineno
+        end_col_offset = node.end_col_offset
+        if self._source_bytes is None or end_lineno is None or end_col_offset is None:
+            return None
+        
+        if self._line_offsets is None:
+            # Byte offset of the start of each line; AST columns are UTF-8 byte
+            # offsets that do not count a leading BOM
+            first_line_start = len(codecs.BOM_UTF8) if self._source_bytes.startswith(codecs.BOM_UTF8) else 0
+            self._line_offsets = [first_line_start, *accumulate(map(len, self._source_bytes.splitlines(True)))]
+        
+        offsets = self._line_offsets
+        start = offsets[node.lineno - 1] + node.col_offset
+        end = offsets[end_lineno - 1] + end_col_offset
+        return self._source_bytes[start:end]
+
+    def _annotation_str(self, annotation: ast.expr) -> str:
+        """Convert an annotation node to string, reusing earlier results for identical source text."""
+        segment = self._source_segment(annotation)
+        if segment is None:
+            return self._to_str(annotation)
+        
+        result = self._annotation_cache.get(segment)
+        if result is None:
+            result = self._annotation_cache[segment] = self._to_str(annotation)
+        return result
+
+    def _annotation_to_string(self, annotation: ast.expr) -> str:
+        """Convert annotation node to string (fallback for Python < 3.9).
+
+        Subscript and Attribute chains are walked in post-order with an explicit
+        stack; each finished sub-annotation leaves one fragment on `parts`.
+        """
+        parts: List[str] = []
+        stack: List[Tuple[ast.expr, bool]] = [(annotation, False)]
+        
+        while stack:
+            node, visited = stack.pop()
+            if isinstance(node, ast.Subscript):
+                if visited:
+                    slice_str = parts.pop()
+                    value = parts.pop()
+                    parts.append(f"{value}[{slice_str}]")
+                else:
+                    # Value is pushed last so it is converted first
+                    stack.append((node, True))
+                    stack.append((node.slice, False))
+                    stack.append((node.value, False))
+            elif isinstance(node, ast.Attribute):
+                if visited:
+                    parts.append(f"{parts.pop()}.{node.attr}")
+                else:
+                    stack.append((node, True))
+                    stack.append((node.value, False))
+            elif isinstance(node, ast.Name):
+                parts.append(node.id)
+            elif isinstance(node, ast.Constant):
+                parts.append(str(node.value))
+            else:
+                parts.append("Any")
+        
+        return "".join(parts)
 
-    def _generate_baseline_docstring(self, func_name: str, args: List[Dict], class_name: str = None) -> str:
+    def _generate_baseline_docstring(self, func_name: str, args: List[ArgInfo], class_name: Optional[str] = None) -> str:
         """Generate a baseline Google-style docstring for a function/method."""
-        lines = []
-        lines.append(f"{func_name}")
+        buf = [func_name]
         
         if args:
-            lines.append("")
-            lines.append("Args:")
-            for arg in args:
-                arg_name = arg['name']
-                arg_type = arg.get('type', 'Any')
-                is_kwargs = arg.get('kwargs', False)
-                is_vararg = arg.get('vararg', False)
-                
-                if is_vararg:
-                    lines.append(f"    *{arg_name} ({arg_type}): Variable positional arguments")
-                elif is_kwargs:
-                    lines.append(f"    **{arg_name} ({arg_type}): Variable keyword arguments")
-                else:
-                    lines.append(f"    {arg_name} ({arg_type}): Description of {arg_name}")
+            buf.append("\n\nArgs:")
+            buf.extend(_format_baseline_arg(arg) for arg in args)
         
         # Add return section
-        lines.append("")
-        lines.append("Returns:")
-        lines.append("    Any: Description of return value")
+        buf.append(_RETURNS_SECTION)
         
-        return "\n".join(lines)
+        return "".join(buf)
+
+    def _count_docstring_lines(self, node: DocstringNode) -> None:
+        """Add the number of lines in the node's docstring (if any) to docstring_lines."""
+        docstring = ast.get_docstring(node, clean=False)
+        if docstring:
+            self.docstring_lines += len(docstring.splitlines())
 
-    def visit_ClassDef(self, node: ast.ClassDef):
+    def visit_Module(self, node: ast.Module) -> Sequence[ast.AST]:
+        self._count_docstring_lines(node)
+        return node.body
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> Sequence[ast.AST]:
         self.classes.append(node.name)
+        self._count_docstring_lines(node)
         
-        # Find methods inside the class
-        for item in node.body:
-            if isinstance(item, ast.FunctionDef):
-                self.methods.append(f"{node.name}.{item.name}")
-                # Extract method details
-                method_info = self._extract_function_info(item, node.name)
-                self.method_details.append(method_info)
-                
-                # Update docstring statistics
-                if method_info['has_docstring']:
-                    self.methods_with_docstrings += 1
-                else:
-                    self.methods_without_docstrings += 1
-        
-        self.generic_visit(node)
+        # Methods are recorded as the walk reaches them in the body, including
+        # those nested in if/try/with/match blocks
+        self._class_name = node.name
+        return node.body
 
-    def visit_FunctionDef(self, node: ast.FunctionDef):
-        # Count only top-level functions (exclude methods)
-        if not any(isinstance(parent, ast.ClassDef) for parent in ast.walk(node)):
+    def visit_FunctionDef(self, node: FunctionNode) -> Sequence[ast.AST]:
+        self._count_docstring_lines(node)
+        
+        class_name = self._class_name
+        if class_name is not None:
+            self.methods.append(f"{class_name}.{node.name}")
+            # Extract method details
+            has_docstring = self._extract_function_info(node, self.method_details, class_name)
+            
+            # Update docstring statistics
+            if has_docstring:
+                self.methods_with_docstrings += 1
+            else:
+                self.methods_without_docstrings += 1
+        else:
             self.functions.append(node.name)
             
             # Extract function details
-            func_info = self._extract_function_info(node)
-            self.function_details.append(func_info)
+            has_docstring = self._extract_function_info(node, self.function_details)
             
             # Update docstring statistics
-            if func_info['has_docstring']:
+            if has_docstring:
                 self.functions_with_docstrings += 1
             else:
                 self.functions_without_docstrings += 1
         
-        self.generic_visit(node)
+        # Nested functions and classes are not reported, so the body is skipped
+        return []
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> Sequence[ast.AST]:
+        # Async functions and methods share the same analysis
+        return self.visit_FunctionDef(node)
+
+
+def _format_baseline_arg(arg: ArgInfo) -> str:
+    """Format one argument line of a baseline docstring."""
+    if arg.vararg:
+        template = _VARARG_TPL
+    elif arg.kwargs:
+        template = _KWARG_TPL
+    else:
+        template = _ARG_TPL
+    return template.format(name=arg.name, type=arg.type)
 
 
-def count_all_comments(source_code: str) -> Dict:
+def count_all_comments(source_code: Union[str, bytes]) -> Dict[str, int]:
     """
     Counts both single-line comments (#) and multi-line string literals (triple quotes).
     Returns a dictionary with counts for each type.
     """
     single_line_comments = 0
     multi_line_comments = 0
-    docstring_lines = 0
     
-    try:
-        # Use tokenize to accurately count comments
-        tokens = tokenize.generate_tokens(StringIO(source_code).readline)
-        
-        for token in tokens:
-            if token.type == tokenize.COMMENT:
-                single_line_comments += 1
-            elif token.type == tokenize.STRING:
-                # Check if it's a triple-quoted string
-                token_str = token.string.strip()
-                if (token_str.startswith('"""') and token_str.endswith('"""')) or \
-                   (token_str.startswith("'''") and token_str.endswith("'''")):
-                    # Count lines in the string
-                    lines = token.string.split('\n')
-                    multi_line_comments += len(lines)
-                    
-                    # Check if it's likely a docstring (first statement in module/class/function)
-                    # We'll use a simple heuristic: if it contains descriptive text
-                    # Remove the quotes and check content
-                    content = token_str[3:-3].strip()
-                    if content and not content.isnumeric():
-                        docstring_lines += len(lines)
-    except:
-        # Fallback to simple line counting if tokenize fails
-        for line in source_code.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("#"):
-                single_line_comments += 1
-            elif stripped.startswith('"""') or stripped.startswith("'''"):
-                multi_line_comments += 1
+    # str and bytes sources each get the matching compiled pattern
+    pattern: Any
+    newline: Any
+    markers: Any
+    if isinstance(source_code, bytes):
+        pattern, newline, markers = _COMMENT_OR_STRING_RE_BYTES, b"\n", (b"#", b'"""', b"'''")
+    else:
+        pattern, newline, markers = _COMMENT_OR_STRING_RE, "\n", ("#", '"""', "'''")
+    
+    # Without a '#' or triple quote there is nothing to count, and substring
+    # checks are far cheaper than scanning every string literal
+    if not any(marker in source_code for marker in markers):
+        return {
+            "single_line_comments": 0,
+            "multi_line_comments": 0,
+            "total_comments": 0
+        }
+    
+    for match in pattern.finditer(source_code):
+        group = match.lastindex
+        if group == 1:
+            single_line_comments += 1
+        elif group == 2:
+            # Count the lines spanned by the triple-quoted string
+            multi_line_comments += source_code.count(newline, match.start(), match.end()) + 1
     
     return {
         "single_line_comments": single_line_comments,
         "multi_line_comments": multi_line_comments,
-        "docstring_lines": docstring_lines,
         "total_comments": single_line_comments + multi_line_comments
     }
 
 
-def analyze_python_code(source_code: str) -> Dict:
-    """Analyzes Python source code provided as a string."""
-    
-    tree = ast.parse(source_code)
+def analyze_python_code(source_code: Union[str, bytes], include_baseline: bool = False) -> Dict[str, Any]:
+    """
+    Analyzes Python source code provided as a string or as raw bytes.
+    Baseline docstrings are only generated when include_baseline is True;
+    otherwise each detail's 'baseline_docstring' is None.
+    Parameters are reported as ArgInfo dataclasses, which orjson serializes
+    as objects; use dataclasses.asdict for other JSON encoders.
+    """
+    # ast.parse(optimize=...) (Python 3.13+) is deliberately not used: its
+    # constant folding turns subscripts such as Generator[None, None, None]
+    # into a constant tuple, which changes the reported annotation strings.
+    try:
+        if isinstance(source_code, bytes):
+            # UTF-8 bytes are parsed as-is; only sources declaring another
+            # encoding (PEP 263) are decoded first, since byte offsets into them
+            # would not line up with the AST's UTF-8 columns
+            encoding, _ = tokenize.detect_encoding(BytesIO(source_code).readline)
+            if encoding not in ("utf-8", "utf-8-sig"):
+                source_code = source_code.decode(encoding)
+        tree = ast.parse(source_code)
+    except SyntaxError:
+        if isinstance(source_code, bytes):
+            # detect_encoding and ast.parse report invalid UTF-8 as a
+            # SyntaxError; decoding raises the UnicodeDecodeError that a bad
+            # declared encoding gives, so both are reported the same way
+            source_code.decode("utf-8")
+        raise
     
-    analyzer = ASTAnalyzer()
+    analyzer = ASTAnalyzer(source_code, include_baseline=include_baseline)
     analyzer.visit(tree)
     
     # Count all types of comments
@@ -263,7 +438,7 @@ def analyze_python_code(source_code: str) -> Dict:
             "total_comments": comment_counts["total_comments"],
             "single_line_comments": comment_counts["single_line_comments"],
             "multi_line_comments": comment_counts["multi_line_comments"],
-            "docstring_lines": comment_counts["docstring_lines"],
+            "docstring_lines": analyzer.docstring_lines,
             # Docstring statistics
             "functions_with_docstrings": analyzer.functions_with_docstrings,
             "functions_without_docstrings": analyzer.functions_without_docstrings,
@@ -0,0 +1,133 @@
+# backend/ast_cache.py
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from analyzer import ANALYZER_VERSION, analyze_python_code
+
+logger = logging.getLogger(__name__)
+
+# Optional on-disk layer so reports survive API restarts; off unless
+# SOURCE_AST_CACHE_DIR names a directory. Entries are never evicted, and
+# reports include each function's docstring text taken from the upload.
+CACHE_DIR = os.environ.get("SOURCE_AST_CACHE_DIR", "")
+
+_PYTHON_VERSION = "%d.%d" % sys.version_info[:2]
+
+# (source sha256, python version, analyzer version, include_baseline)
+CacheKey = Tuple[str, str, str, bool]
+
+# In-memory LRU of reports keyed by CacheKey only, so cached entries never keep
+# the uploaded source alive. Analysis runs in the thread pool, hence the lock.
+MEMORY_CACHE_SIZE = 512
+_memory_cache: "OrderedDict[CacheKey, Dict]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _disk_path(key: CacheKey) -> Path:
+    source_hash, python_version, analyzer_version, include_baseline = key
+    suffix = "-baseline" if include_baseline else ""
+    return Path(CACHE_DIR) / f"{source_hash}-py{python_version}-v{analyzer_version}{suffix}.pkl"
+
+
+def _load_from_disk(key: CacheKey) -> Optional[Dict]:
+    """Load a cached report from disk, returning None if it is missing or unreadable."""
+    if not CACHE_DIR:
+        return None
+
+    try:
+        with open(_disk_path(key), "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, pickle.UnpicklingError) as e:
+        logger.warning(f"Ignoring unreadable AST cache entry: {str(e)}")
+        return None
+
+
+def _save_to_disk(key: CacheKey, report: Dict):
+    """Write a report to disk atomically; failures only disable the disk layer for this entry."""
+    if not CACHE_DIR:
+        return
+
+    path = _disk_path(key)
+    tmp_path = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temp file per write, since concurrent misses for the same
+        # upload run in different threads of this process
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            pickle.dump(report, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write AST cache entry: {str(e)}")
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def _memory_get(key: CacheKey) -> Optional[Dict]:
+    with _memory_lock:
+        report = _memory_cache.get(key)
+        if report is not None:
+            _memory_cache.move_to_end(key)
+        return report
+
+
+def _memory_put(key: CacheKey, report: Dict):
+    with _memory_lock:
+        _memory_cache[key] = report
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _analyze_uncached(key: CacheKey, source_code: Union[str, bytes]) -> Dict:
+    report = _load_from_disk(key)
+    if report is not None:
+        logger.info(f"AST cache hit (disk): {key[0][:12]}")
+        return report
+
+    logger.info(f"AST cache miss: {key[0][:12]}")
+    report = analyze_python_code(source_code, include_baseline=key[3])
+    _save_to_disk(key, report)
+    return report
+
+
+def cached_analyze(source_code: Union[str, bytes], source_hash: Optional[str] = None, include_baseline: bool = False) -> Dict:
+    """
+    Analyze Python source code, reusing the report of a previous analysis of identical content.
+
+    Args:
+        source_code: Python source code to analyze, as a string or raw bytes
+        source_hash: SHA-256 hex digest of the raw source, computed here if not given
+        include_baseline: Whether to generate baseline docstrings
+
+    Returns:
+        Dictionary with analysis results (shared between cache hits; do not mutate)
+    """
+    if source_hash is None:
+        raw = source_code.encode("utf-8") if isinstance(source_code, str) else source_code
+        source_hash = hashlib.sha256(raw).hexdigest()
+
+    key = (source_hash, _PYTHON_VERSION, ANALYZER_VERSION, include_baseline)
+    # The hit is detected on this call's own lookup, so hits from other
+    # thread-pool requests are never attributed to this one
+    report = _memory_get(key)
+    if report is not None:
+        logger.info(f"AST cache hit (memory): {source_hash[:12]}")
+    else:
+        report = _analyze_uncached(key, source_code)
+        _memory_put(key, report)
+
+    return report
@@ -1,6 +1,9 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from analyzer import analyze_python_code
+from fastapi.responses import ORJSONResponse
+from ast_cache import cached_analyze
+import hashlib
 import logging
 
 # -------------------------------------------------------------------
@@ -9,6 +12,12 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# -------------------------------------------------------------------
+# Upload limits
+# -------------------------------------------------------------------
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
 # -------------------------------------------------------------------
 # FastAPI app setup
 # -------------------------------------------------------------------
@@ -16,6 +25,8 @@ app = FastAPI(
     title="Python Docstring Generator API",
     description="Analyzes Python code structure and generates docstrings",
     version="1.0.0",
+    # Reports hold many small dicts; orjson serializes them much faster than json
+    default_response_class=ORJSONResponse,
 )
 
 # -------------------------------------------------------------------
@@ -51,12 +62,16 @@ async def health_check():
 
 
 @app.post("/analyze")
-async def analyze_code(file: UploadFile = File(...)):
+async def analyze_code(
+    file: UploadFile = File(...),
+    baseline: bool = False,
+):
     """
     Analyze Python code from an uploaded file.
 
     Args:
         file: Python file to analyze (.py extension expected)
+        baseline: Generate baseline docstrings (query parameter, off by default)
 
     Returns:
         Dictionary with analysis results
@@ -69,8 +84,26 @@ async def analyze_code(file: UploadFile = File(...)):
                 detail="Only Python (.py) files are supported",
             )
 
-        # Read file content
-        content = await file.read()
+        # Reject uploads whose size is already known to be over the limit
+        if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit",
+            )
+
+        # Read file content in chunks, stopping as soon as the limit is passed
+        chunks = []
+        total_size = 0
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total_size += len(chunk)
+            if total_size > MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit",
+                )
+            chunks.append(chunk)
+
+        content = b"".join(chunks)
 
         if not content:
             raise HTTPException(
@@ -78,38 +111,50 @@ async def analyze_code(file: UploadFile = File(...)):
                 detail="Uploaded file is empty",
             )
 
-        # Decode content
-        try:
-            source_code = content.decode("utf-8")
-        except UnicodeDecodeError:
-            raise HTTPException(
-                status_code=400,
-                detail="File must be UTF-8 encoded",
-            )
+        # Hash the raw bytes to look up previously analyzed uploads
+        source_hash = hashlib.sha256(content).hexdigest()
 
         # Log basic file info (no source code for privacy)
         logger.info(
             f"Analyzing file: {file.filename}, "
-            f"Size: {len(source_code)} chars"
+            f"Size: {len(content)} bytes"
         )
 
-        # Analyze code
+        # Analyze code in the thread pool so the CPU-bound parse does not
+        # block the event loop (and every other request) while it runs.
+        # The raw bytes are parsed as-is; bytes that do not decode (as UTF-8
+        # or as the declared encoding) raise UnicodeDecodeError.
         try:
-            analysis_result = analyze_python_code(source_code)
+            analysis_result = await run_in_threadpool(
+                cached_analyze,
+                content,
+                source_hash,
+                include_baseline=baseline,
+            )
         except SyntaxError as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid Python syntax: {str(e)}",
             )
+        except UnicodeDecodeError as e:
+            # The bytes are not valid UTF-8 or do not match the file's
+            # declared (PEP 263) encoding
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid source encoding: {str(e)}",
+            )
 
-        return {
+        # Returned as a response directly so orjson serializes the report
+        # (including its ArgInfo dataclasses) without FastAPI's jsonable_encoder
+        # first copying it into plain dicts
+        return ORJSONResponse({
             "filename": file.filename,
             "analysis": analysis_result,
             "metadata": {
                 "file_size_bytes": len(content),
-                "lines_of_code": len(source_code.splitlines()),
+                "lines_of_code": len(content.splitlines()),
             },
-        }
+        })
 
     except HTTPException:
         raise
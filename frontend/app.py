@@ -1,7 +1,18 @@
 # frontend/app.py
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
 import streamlit as st
-import requests
-from typing import Dict, Optional, List
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+from typing import TYPE_CHECKING, Dict, Optional, List
+
+# requests and pandas are imported where they are used, keeping them off the
+# app's cold-start import path
+if TYPE_CHECKING:
+    import requests
 
 # Page configuration
 st.set_page_config(
@@ -11,7 +22,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+_CSS = """
 <style>
     .glass-card {
         background: rgba(255, 255, 255, 0.1);
@@ -55,16 +66,6 @@ st.markdown("""
         font-family: monospace;
     }
     
-    .baseline-docstring {
-        background: rgba(59, 130, 246, 0.1);
-        border-left: 4px solid #3b82f6;
-        border-radius: 10px;
-        padding: 15px;
-        margin: 10px 0;
-        font-family: monospace;
-        white-space: pre-wrap;
-    }
-    
     .comment-type {
         padding: 5px 10px;
         border-radius: 5px;
@@ -91,29 +92,127 @@ st.markdown("""
         background-clip: text;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+st.markdown(_CSS, unsafe_allow_html=True)
+
+# HTML fragments, built once at import instead of on every render
+_COMMENT_TYPES_TMPL = """
+<div style="margin-top: 20px;">
+    <span class="comment-type single-line-comment">Single-line (#): {single}</span>
+    <span class="comment-type multi-line-comment" style="margin-left: 10px;">Multi-line (\"\"\"): {multi}</span>
+</div>
+"""
+
+_DISTRIBUTION_TMPL = """
+<div style="margin-top: 20px;">
+    <p><strong>Distribution:</strong></p>
+    <p>Single-line: {single:.1f}%</p>
+    <p>Multi-line: {multi:.1f}%</p>
+</div>
+"""
+
+# Parameter list lines by argument kind
+_ARG_TEMPLATES = {
+    "vararg": "*{name}: {type}<br>",
+    "kwargs": "**{name}: {type}<br>",
+    "plain": "{name}: {type}{optional}<br>",
+}
 
 BACKEND_URL = "http://localhost:8000"
 
+# (connect, read) timeouts in seconds: an unreachable backend fails fast,
+# while a slow analysis still gets time to finish
+HEALTH_TIMEOUT = (1.0, 2.0)
+ANALYZE_TIMEOUT = (1.0, 10.0)
+
+
+# One pooled session shared by every rerun, so backend calls reuse
+# keep-alive connections instead of opening a new one each time
+@st.cache_resource
+def get_session() -> "requests.Session":
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+
+# Backend requests run here so the script thread stays free to update the UI
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="backend-request")
+
 
+# Every widget interaction reruns the script, so the health probe result is
+# reused for a few seconds instead of hitting the backend on each rerun
+@st.cache_data(ttl=5, show_spinner=False)
 def check_backend_connection() -> bool:
+    import requests
+
     try:
-        response = requests.get(f"{BACKEND_URL}/health", timeout=2)
+        # A 200 status is enough; the body is never parsed
+        response = get_session().get(f"{BACKEND_URL}/health", timeout=HEALTH_TIMEOUT)
         return response.status_code == 200
-    except:
+    except requests.exceptions.RequestException:
         return False
 
 
-def analyze_python_file(file_content: bytes, filename: str) -> Optional[Dict]:
-    try:
-        files = {"file": (filename, file_content, "text/x-python")}
-        response = requests.post(f"{BACKEND_URL}/analyze", files=files, timeout=10)
-
-        if response.status_code == 200:
-            return response.json()
+# Keyed on the content hash (the leading underscore keeps Streamlit from
+# hashing the file contents again); failures raise so they are never cached.
+# The cache is shared by every session, so it is bounded in size and age.
+@st.cache_data(show_spinner=False, max_entries=64, ttl="1h")
+def _cached_analyze(file_hash: str, _content: bytes, filename: str) -> Dict:
+    files = {"file": (filename, _content, "text/x-python")}
+    response = get_session().post(
+        f"{BACKEND_URL}/analyze",
+        files=files,
+        params={"baseline": "true"},
+        timeout=ANALYZE_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def analyze_python_file(content: bytes, filename: str, file_hash: str) -> Optional[Dict]:
+    import requests
+
+    ctx = get_script_run_ctx()
+
+    def run() -> Dict:
+        # st.cache_data looks up the running script's context, which worker
+        # threads do not have; only the script thread touches the UI
+        thread = threading.current_thread()
+        add_script_run_ctx(thread, ctx)
+        try:
+            return _cached_analyze(file_hash, content, filename)
+        finally:
+            # Pooled threads outlive this run, so the context is detached
+            # again; add_script_run_ctx has no way to unset it
+            vars(thread).pop(SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+
+    label = "Analyzing code structure, comments and docstrings..."
+    started = time.monotonic()
+    future = get_executor().submit(run)
+    with st.status(label) as status:
+        while not wait([future], timeout=0.25).done:
+            status.update(label=f"{label} ({time.monotonic() - started:.1f}s)")
+        if future.exception() is None:
+            status.update(label=f"Analysis finished in {time.monotonic() - started:.1f}s", state="complete")
         else:
-            st.error(response.json().get("detail", "Backend error"))
-            return None
+            status.update(label="Analysis failed", state="error")
+
+    try:
+        return future.result()
+    except requests.exceptions.HTTPError as e:
+        try:
+            detail = e.response.json().get("detail", "Backend error")
+        except ValueError:
+            detail = "Backend error"
+        st.error(detail)
+        return None
     except requests.exceptions.ConnectionError:
         st.error("Cannot connect to backend. Make sure FastAPI is running.")
         return None
@@ -124,32 +223,9 @@ def analyze_python_file(file_content: bytes, filename: str) -> Optional[Dict]:
 
 def display_docstring_analysis(counts: Dict):
     """Display docstring statistics and analysis."""
-    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-    st.subheader("📝 Docstring Analysis")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            "Functions with Docstrings", 
-            f"{counts['functions_with_docstrings']}/{counts['total_functions']}",
-            delta=f"{counts['functions_with_docstrings'] - counts['functions_without_docstrings']}"
-        )
-    
-    with col2:
-        st.metric(
-            "Methods with Docstrings",
-            f"{counts['methods_with_docstrings']}/{counts['total_methods']}",
-            delta=f"{counts['methods_with_docstrings'] - counts['methods_without_docstrings']}"
-        )
+    with st.container(border=True):
+        st.subheader("📝 Docstring Analysis")
     
-    with col3:
-        st.metric(
-            "Total Docstring Coverage",
-            f"{counts['total_with_docstrings']}/{counts['total_with_docstrings'] + counts['total_without_docstrings']}"
-        )
-    
-    with col4:
         coverage = counts.get('docstring_coverage', 0)
         if coverage >= 80:
             delta_color = "normal"
@@ -160,130 +236,225 @@ def display_docstring_analysis(counts: Dict):
         else:
             delta_color = "inverse"
             emoji = "❌"
-        
-        st.metric(
-            "Coverage Percentage",
-            f"{coverage:.1f}%",
-            delta=emoji,
-            delta_color=delta_color
-        )
     
-    st.markdown('</div>', unsafe_allow_html=True)
+        # (label, value, delta, delta_color) for each column
+        metrics = [
+            ("Functions with Docstrings",
+             f"{counts['functions_with_docstrings']}/{counts['total_functions']}",
+             f"{counts['functions_with_docstrings'] - counts['functions_without_docstrings']}",
+             "normal"),
+            ("Methods with Docstrings",
+             f"{counts['methods_with_docstrings']}/{counts['total_methods']}",
+             f"{counts['methods_with_docstrings'] - counts['methods_without_docstrings']}",
+             "normal"),
+            ("Total Docstring Coverage",
+             f"{counts['total_with_docstrings']}/{counts['total_with_docstrings'] + counts['total_without_docstrings']}",
+             None,
+             "normal"),
+            ("Coverage Percentage", f"{coverage:.1f}%", emoji, delta_color),
+        ]
+        for col, (label, value, delta, color) in zip(st.columns(4), metrics):
+            col.metric(label, value, delta=delta, delta_color=color)
 
 
 def display_comment_analysis(counts: Dict):
     """Display comment statistics."""
-    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-    st.subheader("💬 Comment Analysis")
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric(
-            "Total Comments", 
-            counts['total_comments']
-        )
-        st.caption("All # comments and triple-quoted strings")
-    
-    with col2:
-        st.metric(
-            "Single-line Comments",
-            counts['single_line_comments']
-        )
-        st.caption("Lines starting with #")
-    
-    with col3:
-        st.metric(
-            "Multi-line Comments",
-            counts['multi_line_comments']
-        )
-        st.caption("Triple-quoted strings (''' or \"\"\")")
+    with st.container(border=True):
+        st.subheader("💬 Comment Analysis")
     
-    # Calculate comment density
-    st.markdown("---")
-    col1, col2 = st.columns(2)
+        # (label, value, caption) for each column
+        metrics = [
+            ("Total Comments", counts['total_comments'], "All # comments and triple-quoted strings"),
+            ("Single-line Comments", counts['single_line_comments'], "Lines starting with #"),
+            ("Multi-line Comments", counts['multi_line_comments'], "Triple-quoted strings (''' or \"\"\")"),
+        ]
+        for col, (label, value, caption) in zip(st.columns(3), metrics):
+            col.metric(label, value)
+            col.caption(caption)
     
-    with col1:
-        comment_types_html = f"""
-        <div style="margin-top: 20px;">
-            <span class="comment-type single-line-comment">Single-line (#): {counts['single_line_comments']}</span>
-            <span class="comment-type multi-line-comment" style="margin-left: 10px;">Multi-line (\"\"\"): {counts['multi_line_comments']}</span>
-        </div>
-        """
-        st.markdown(comment_types_html, unsafe_allow_html=True)
+        # Calculate comment density
+        st.markdown("---")
+        col1, col2 = st.columns(2)
     
-    with col2:
-        if counts['total_comments'] > 0:
-            single_line_percent = (counts['single_line_comments'] / counts['total_comments']) * 100
-            multi_line_percent = (counts['multi_line_comments'] / counts['total_comments']) * 100
-            st.markdown(f"""
-            <div style="margin-top: 20px;">
-                <p><strong>Distribution:</strong></p>
-                <p>Single-line: {single_line_percent:.1f}%</p>
-                <p>Multi-line: {multi_line_percent:.1f}%</p>
-            </div>
-            """, unsafe_allow_html=True)
+        with col1:
+            comment_types_html = _COMMENT_TYPES_TMPL.format(
+                single=counts['single_line_comments'],
+                multi=counts['multi_line_comments'],
+            )
+            st.markdown(comment_types_html, unsafe_allow_html=True)
     
-    st.markdown('</div>', unsafe_allow_html=True)
-
+        with col2:
+            # With no comments both shares are simply 0%
+            denom = counts['total_comments'] or 1
+            single_line_percent = counts['single_line_comments'] * 100.0 / denom
+            multi_line_percent = counts['multi_line_comments'] * 100.0 / denom
+            st.markdown(
+                _DISTRIBUTION_TMPL.format(single=single_line_percent, multi=multi_line_percent),
+                unsafe_allow_html=True,
+            )
+
+
+@lru_cache(maxsize=1024)
+def _fmt_arg(name: str, param_type: str, is_optional: bool, is_vararg: bool, is_kwargs: bool) -> str:
+    """Format one parameter line of the parameter list."""
+    kind = "vararg" if is_vararg else "kwargs" if is_kwargs else "plain"
+    return _ARG_TEMPLATES[kind].format(
+        name=name,
+        type=param_type,
+        optional=" (optional)" if is_optional else "",
+    )
+
+
+def display_function_details(function_details: List[Dict], title: str, file_id: str, is_method: bool = False):
+    """Display functions or methods as one summary table, with details for the selected row."""
+    # Deferred: pandas is slow to import and only needed once results are shown
+    import pandas as pd
 
-def display_function_details(function_details: List[Dict], title: str, is_method: bool = False):
-    """Display detailed information about functions or methods."""
     if not function_details:
         return
     
     st.markdown(f"### {title}")
     
-    for func in function_details:
-        with st.expander(f"{func['class_name'] + '.' if is_method else ''}{func['name']}"):
-            col1, col2 = st.columns([1, 3])
+    names = [f"{func['class_name'] + '.' if is_method else ''}{func['name']}" for func in function_details]
+
+    summary = pd.DataFrame({
+        "Name": names,
+        "Has Docstring": [func['has_docstring'] for func in function_details],
+        "Returns": [func['return_type'] or "" for func in function_details],
+        "Parameters": [len(func['args']) for func in function_details],
+    })
+    event = st.dataframe(
+        summary,
+        width="stretch",
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        # Keyed per upload, so a row selected in one file's table is not
+        # carried over to the next file's analysis
+        key=f"{'method' if is_method else 'function'}_details_table_{file_id}",
+    )
+    
+    selected_rows = event.selection.rows
+    if not selected_rows:
+        st.caption("Select a row to see its parameters and docstring.")
+        return
+    
+    row = selected_rows[0]
+    func = function_details[row]
+    with st.expander(names[row], expanded=True):
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            # Docstring status
+            if func['has_docstring']:
+                st.markdown('<span class="docstring-present">✅ Has Docstring</span>', unsafe_allow_html=True)
+            else:
+                st.markdown('<span class="docstring-missing">❌ Missing Docstring</span>', unsafe_allow_html=True)
             
-            with col1:
-                # Docstring status
-                if func['has_docstring']:
-                    st.markdown('<span class="docstring-present">✅ Has Docstring</span>', unsafe_allow_html=True)
-                else:
-                    st.markdown('<span class="docstring-missing">❌ Missing Docstring</span>', unsafe_allow_html=True)
-                
-                # Parameters
-                if func['args']:
-                    st.markdown("**Parameters:**")
-                    param_html = '<div class="param-list">'
-                    for arg in func['args']:
-                        param_type = arg.get('type', 'Any')
-                        is_optional = arg.get('default', False)
-                        is_vararg = arg.get('vararg', False)
-                        is_kwargs = arg.get('kwargs', False)
-                        
-                        if is_vararg:
-                            param_html += f"*{arg['name']}: {param_type}<br>"
-                        elif is_kwargs:
-                            param_html += f"**{arg['name']}: {param_type}<br>"
-                        else:
-                            optional_mark = " (optional)" if is_optional else ""
-                            param_html += f"{arg['name']}: {param_type}{optional_mark}<br>"
-                    param_html += '</div>'
-                    st.markdown(param_html, unsafe_allow_html=True)
-                
-                # Return type
-                if func['return_type']:
-                    st.markdown(f"**Returns:** `{func['return_type']}`")
+            # Parameters
+            if func['args']:
+                st.markdown("**Parameters:**")
+                parts = ['<div class="param-list">']
+                for arg in func['args']:
+                    parts.append(_fmt_arg(
+                        arg['name'],
+                        arg.get('type', 'Any'),
+                        arg.get('default', False),
+                        arg.get('vararg', False),
+                        arg.get('kwargs', False),
+                    ))
+                parts.append('</div>')
+                st.markdown("".join(parts), unsafe_allow_html=True)
             
-            with col2:
-                if func['has_docstring'] and func['docstring']:
-                    st.markdown("**Current Docstring:**")
-                    st.code(func['docstring'], language='python')
-                else:
-                    st.markdown("**Baseline Docstring:**")
-                    st.markdown(f'<div class="baseline-docstring">{func["baseline_docstring"]}</div>', unsafe_allow_html=True)
-                    
-                    # Add copy to clipboard button for baseline docstring
-                    if st.button(f"📋 Copy Baseline", key=f"copy_{func['name']}_{func.get('class_name', '')}"):
-                        st.code(func['baseline_docstring'], language='python')
-                        st.success("Copied to clipboard!")
+            # Return type
+            if func['return_type']:
+                st.markdown(f"**Returns:** `{func['return_type']}`")
+        
+        with col2:
+            if func['has_docstring'] and func['docstring']:
+                st.markdown("**Current Docstring:**")
+                st.code(func['docstring'], language='python')
+            else:
+                st.markdown("**Baseline Docstring:**")
+                # st.code has a built-in copy-to-clipboard button
+                st.code(func['baseline_docstring'], language='python')
+
+
+# Each tab is its own fragment, so a widget inside one tab only reruns that tab
+@st.fragment
+def _render_functions_tab(analysis: Dict, file_id: str):
+    if analysis["function_details"]:
+        display_function_details(analysis["function_details"], "Top-level Functions", file_id)
+    else:
+        st.info("No top-level functions found.")
+
+
+@st.fragment
+def _render_methods_tab(analysis: Dict, file_id: str):
+    if analysis["method_details"]:
+        display_function_details(analysis["method_details"], "Class Methods", file_id, is_method=True)
+    else:
+        st.info("No methods found.")
+
+
+@st.fragment
+def _render_docstrings_tab(analysis: Dict, counts: Dict):
+    st.markdown("### 📋 Docstring Summary")
+    
+    # Functions and methods with missing docstrings, collected in one pass
+    missing_functions = []
+    missing_methods = []
+    for details, missing in ((analysis["function_details"], missing_functions),
+                             (analysis["method_details"], missing_methods)):
+        for item in details:
+            if not item['has_docstring']:
+                missing.append(item)
+    
+    if missing_functions or missing_methods:
+        st.warning(f"Found {len(missing_functions)} functions and {len(missing_methods)} methods without docstrings")
+        
+        if missing_functions:
+            st.markdown("**Functions needing docstrings:**")
+            for func in missing_functions:
+                st.markdown(f"- `{func['name']}()`")
+        
+        if missing_methods:
+            st.markdown("**Methods needing docstrings:**")
+            for method in missing_methods:
+                st.markdown(f"- `{method['class_name']}.{method['name']}()`")
+    else:
+        st.success("🎉 All functions and methods have docstrings!")
+    
+    # Show coverage progress
+    if counts['total_functions'] + counts['total_methods'] > 0:
+        coverage = counts.get('docstring_coverage', 0)
+        st.progress(coverage / 100)
+        st.caption(f"Overall docstring coverage: {coverage:.1f}%")
+
+
+@st.fragment
+def _render_file_info_tab(data: Dict, counts: Dict):
+    st.subheader("📄 File Information")
+    col1, col2, col3 = st.columns(3)
+    col1.write(f"**Filename:** {data['filename']}")
+    col2.write(f"**Size:** {data['metadata']['file_size_bytes']} bytes")
+    col3.write(f"**Lines of Code:** {data['metadata']['lines_of_code']}")
+    
+    # Additional stats
+    st.markdown("---")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        comment_density = counts['total_comments'] * 100.0 / (data['metadata']['lines_of_code'] or 1)
+        st.metric("Comment Density", f"{comment_density:.1f}%")
+    with col2:
+        st.metric("Docstring Lines", counts['docstring_lines'])
+    with col3:
+        st.metric("Total Elements", counts['total_functions'] + counts['total_methods'] + counts['total_classes'])
 
 
-def display_analysis_results(data: Dict):
+# A fragment, so interacting with the results only reruns this section
+@st.fragment
+def display_analysis_results(data: Dict, file_id: str):
     analysis = data["analysis"]
     counts = analysis["counts"]
 
@@ -304,71 +475,23 @@ def display_analysis_results(data: Dict):
     display_docstring_analysis(counts)
 
     # Detailed breakdown with tabs
-    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-    st.subheader("📝 Detailed Breakdown")
+    with st.container(border=True):
+        st.subheader("📝 Detailed Breakdown")
     
-    # Create tabs for different views
-    tab1, tab2, tab3, tab4 = st.tabs(["Functions", "Methods", "Docstrings", "File Info"])
+        # Create tabs for different views
+        tab1, tab2, tab3, tab4 = st.tabs(["Functions", "Methods", "Docstrings", "File Info"])
 
-    with tab1:
-        if analysis["function_details"]:
-            display_function_details(analysis["function_details"], "Top-level Functions")
-        else:
-            st.info("No top-level functions found.")
+        with tab1:
+            _render_functions_tab(analysis, file_id)
 
-    with tab2:
-        if analysis["method_details"]:
-            display_function_details(analysis["method_details"], "Class Methods", is_method=True)
-        else:
-            st.info("No methods found.")
+        with tab2:
+            _render_methods_tab(analysis, file_id)
 
-    with tab3:
-        st.markdown("### 📋 Docstring Summary")
-        
-        # Functions with missing docstrings
-        missing_functions = [f for f in analysis["function_details"] if not f['has_docstring']]
-        missing_methods = [m for m in analysis["method_details"] if not m['has_docstring']]
-        
-        if missing_functions or missing_methods:
-            st.warning(f"Found {len(missing_functions)} functions and {len(missing_methods)} methods without docstrings")
-            
-            if missing_functions:
-                st.markdown("**Functions needing docstrings:**")
-                for func in missing_functions:
-                    st.markdown(f"- `{func['name']}()`")
-            
-            if missing_methods:
-                st.markdown("**Methods needing docstrings:**")
-                for method in missing_methods:
-                    st.markdown(f"- `{method['class_name']}.{method['name']}()`")
-        else:
-            st.success("🎉 All functions and methods have docstrings!")
-        
-        # Show coverage progress
-        if counts['total_functions'] + counts['total_methods'] > 0:
-            coverage = counts.get('docstring_coverage', 0)
-            st.progress(coverage / 100)
-            st.caption(f"Overall docstring coverage: {coverage:.1f}%")
-
-    with tab4:
-        st.subheader("📄 File Information")
-        col1, col2, col3 = st.columns(3)
-        col1.write(f"**Filename:** {data['filename']}")
-        col2.write(f"**Size:** {data['metadata']['file_size_bytes']} bytes")
-        col3.write(f"**Lines of Code:** {data['metadata']['lines_of_code']}")
-        
-        # Additional stats
-        st.markdown("---")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            comment_density = (counts['total_comments'] / max(data['metadata']['lines_of_code'], 1)) * 100
-            st.metric("Comment Density", f"{comment_density:.1f}%")
-        with col2:
-            st.metric("Docstring Lines", counts['docstring_lines'])
-        with col3:
-            st.metric("Total Elements", counts['total_functions'] + counts['total_methods'] + counts['total_classes'])
+        with tab3:
+            _render_docstrings_tab(analysis, counts)
 
-    st.markdown('</div>', unsafe_allow_html=True)
+        with tab4:
+            _render_file_info_tab(data, counts)
 
 
 def main():
@@ -382,33 +505,55 @@ def main():
     if not check_backend_connection():
         st.error("Backend server is not running.")
         st.code("cd backend\npython main.py")
+        if st.button("🔄 Refresh"):
+            check_backend_connection.clear()
+            st.rerun()
         return
 
-    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-    st.subheader("📤 Upload Python File")
+    with st.container(border=True):
+        st.subheader("📤 Upload Python File")
 
-    uploaded_file = st.file_uploader("Choose a .py file", type=["py"])
+        uploaded_file = st.file_uploader("Choose a .py file", type=["py"])
 
-    if uploaded_file:
-        st.success(f"✅ File uploaded: {uploaded_file.name}")
+        if uploaded_file:
+            st.success(f"✅ File uploaded: {uploaded_file.name}")
 
-        with st.expander("📋 Preview Code"):
-            st.code(uploaded_file.getvalue().decode("utf-8"), language="python")
+            # getvalue() shares the uploader's buffer, so one bytes object serves
+            # the preview, the hash and the request
+            raw = uploaded_file.getvalue()
 
-        if st.button("🔍 Analyze Code, Comments & Docstrings", type="primary"):
-            with st.spinner("Analyzing code structure, comments and docstrings..."):
-                uploaded_file.seek(0)
-                result = analyze_python_file(uploaded_file.read(), uploaded_file.name)
+            # Decode the preview once per uploaded file rather than on every rerun
+            if st.session_state.get("preview_file_id") != uploaded_file.file_id:
+                st.session_state["preview_file_id"] = uploaded_file.file_id
+                st.session_state["preview_code"] = raw.decode("utf-8", errors="replace")
 
-                if result:
-                    display_analysis_results(result)
-                    st.success("✅ Analysis completed successfully!")
-                    
+            with st.expander("📋 Preview Code"):
+                st.code(st.session_state["preview_code"], language="python")
 
-    else:
-        st.info("👆 Please upload a Python (.py) file to begin analysis")
+            analyzed = False
+            if st.button("🔍 Analyze Code, Comments & Docstrings", type="primary"):
+                if st.session_state.get("last_analysis_file_id") == uploaded_file.file_id:
+                    # This upload was already analyzed; skip hashing, the worker
+                    # thread and the request and show the stored result
+                    analyzed = True
+                else:
+                    file_hash = hashlib.blake2b(raw, digest_size=16).hexdigest()
+                    result = analyze_python_file(raw, uploaded_file.name, file_hash)
+
+                    if result:
+                        # Kept across reruns so the results stay on screen after
+                        # other widgets are used, as long as the same file is loaded
+                        st.session_state["last_analysis"] = result
+                        st.session_state["last_analysis_file_id"] = uploaded_file.file_id
+                        analyzed = True
+
+            if st.session_state.get("last_analysis_file_id") == uploaded_file.file_id:
+                display_analysis_results(st.session_state["last_analysis"], uploaded_file.file_id)
+                if analyzed:
+                    st.success("✅ Analysis completed successfully!")
 
-    st.markdown('</div>', unsafe_allow_html=True)
+        else:
+            st.info("👆 Please upload a Python (.py) file to begin analysis")
 
     # Info section
     st.markdown("""
@@ -0,0 +1,30 @@
+# setup.py
+"""
+Optional native build of the analyzer module.
+
+With mypy installed,
+
+    python setup.py build_ext --inplace
+
+compiles backend/analyzer.py with mypyc into backend/analyzer.*.so, which
+Python imports in preference to analyzer.py. Without mypyc the build is
+skipped and the pure-Python module is used unchanged.
+"""
+from setuptools import setup
+
+try:
+    from mypyc.build import mypycify
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = mypycify(["backend/analyzer.py"])
+
+setup(
+    name="python-docstring-analyzer",
+    version="1.0.0",
+    # ArgInfo uses dataclass(slots=True)
+    python_requires=">=3.10",
+    package_dir={"": "backend"},
+    py_modules=["analyzer", "ast_cache", "main"],
+    ext_modules=ext_modules,
+)
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The backend modules import each other as top-level modules (uvicorn is run
+# from inside backend/), so tests import them the same way
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,65 @@
+from analyzer import analyze_python_code
+
+
+def test_methods_in_class_blocks_are_reported():
+    source = '''
+class A:
+    def direct(self):
+        """Direct."""
+
+    if True:
+        def cond(self):
+            pass
+
+    try:
+        def t(self):
+            """In try."""
+    except Exception:
+        pass
+'''
+    report = analyze_python_code(source)
+
+    assert report["functions"] == []
+    assert report["methods"] == ["A.direct", "A.cond", "A.t"]
+    assert [d["class_name"] for d in report["method_details"]] == ["A", "A", "A"]
+    assert report["counts"]["methods_with_docstrings"] == 2
+    assert report["counts"]["methods_without_docstrings"] == 1
+
+
+def test_defs_in_blocks_at_module_and_class_level():
+    source = '''
+import sys
+
+if sys.version_info >= (3, 10):
+    def modern():
+        """Modern.
+
+        Two more lines.
+        """
+else:
+    def legacy():
+        pass
+
+with open(__file__):
+    class Wrapped:
+        """Wrapped."""
+
+        match sys.platform:
+            case "linux":
+                def on_linux(self):
+                    """On Linux."""
+            case _:
+                def elsewhere(self):
+                    pass
+
+def outer():
+    def inner():
+        """Nested functions are not reported."""
+'''
+    report = analyze_python_code(source)
+
+    assert report["functions"] == ["modern", "legacy", "outer"]
+    assert report["classes"] == ["Wrapped"]
+    assert report["methods"] == ["Wrapped.on_linux", "Wrapped.elsewhere"]
+    # modern (4 lines), Wrapped (1) and on_linux (1)
+    assert report["counts"]["docstring_lines"] == 6
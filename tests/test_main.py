@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app)
+
+
+def _analyze(content: bytes):
+    return client.post("/analyze", files={"file": ("upload.py", content, "text/x-python")})
+
+
+def test_invalid_utf8_without_coding_cookie():
+    response = _analyze(b"def f():\n    return '\xff'\n")
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid source encoding:")
+
+
+def test_invalid_utf8_on_first_line():
+    response = _analyze(b"x = '\xff'\n")
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid source encoding:")
+
+
+def test_bytes_not_matching_coding_cookie():
+    response = _analyze(b"# -*- coding: ascii -*-\nx = '\xe9'\n")
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid source encoding:")
+
+
+def test_syntax_error_in_valid_utf8():
+    response = _analyze("x = 'é'\ndef broken(:\n".encode("utf-8"))
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid Python syntax:")